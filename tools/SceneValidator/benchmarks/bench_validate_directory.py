@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# Benchmark serial, threaded-read and process-pool structural validation of a scene directory
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+TOOL_DIR = os.path.dirname(HERE)
+
+
+def build_directory(directory: str, scene_path: str, count: int, elements: int) -> None:
+    """Write count scene files, each with the example scene's elements repeated."""
+    with open(scene_path, 'r') as f:
+        scene = json.load(f)
+    scene["elements"] = (scene["elements"] * (elements // len(scene["elements"]) + 1))[:elements]
+    for i in range(count):
+        scene["scene_id"] = f"sc_{i:06d}"
+        with open(os.path.join(directory, f"scene_{i:06d}.json"), 'w') as f:
+            json.dump(scene, f)
+
+
+def drop_page_cache() -> None:
+    """Evict cached file data so the next run reads from disk (Linux, root only)."""
+    os.sync()
+    with open("/proc/sys/vm/drop_caches", 'w') as f:
+        f.write("3")
+
+
+def time_run(validator, directory: str, repeat: int, cold: bool = False) -> float:
+    """Best wall time of validate_directory over repeat runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        if cold:
+            drop_page_cache()
+        start = time.perf_counter()
+        validator.validate_directory(directory)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark directory validation with and without the process pool")
+    parser.add_argument("--files", type=int, default=5000, help="Number of scene files to generate")
+    parser.add_argument("--elements", type=int, default=4, help="Elements per scene (controls file size)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Pool size for the pool run")
+    parser.add_argument("--read-concurrency", type=int, default=16, help="Read threads for the in-process run")
+    parser.add_argument("--cold", action="store_true", help="Drop the page cache before every run (Linux, root)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per mode; the best time is reported")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        scenes_dir = os.path.join(work_dir, "scenes")
+        os.mkdir(scenes_dir)
+        build_directory(scenes_dir, os.path.join(TOOL_DIR, "example_scene.json"), args.files, args.elements)
+
+        with open(os.path.join(TOOL_DIR, "config.json"), 'r') as f:
+            config = json.load(f)
+        # Structural checks only: no Gemini, no memo, so every run does the full work
+        config.pop("gemini_api_key", None)
+        config["memoize_results"] = False
+        config_path = os.path.join(work_dir, "config.json")
+        with open(config_path, 'w') as f:
+            json.dump(config, f)
+
+        # The validator logs to scene_validator.log in the working directory
+        os.chdir(work_dir)
+        sys.path.insert(0, TOOL_DIR)
+        import scene_validator
+        logging.getLogger("SceneValidator").setLevel(logging.WARNING)
+
+        validator = scene_validator.SceneValidator(config_path)
+
+        validator.parallel_min_files = float("inf")
+        validator.read_concurrency = 1
+        serial = time_run(validator, scenes_dir, args.repeat, args.cold)
+        validator.read_concurrency = args.read_concurrency
+        in_process = time_run(validator, scenes_dir, args.repeat, args.cold)
+
+        validator.parallel_min_files = 0
+        validator.max_workers = args.workers
+        pooled = time_run(validator, scenes_dir, args.repeat, args.cold) if args.workers >= 2 else None
+
+        size = os.path.getsize(os.path.join(scenes_dir, "scene_000000.json"))
+        print(f"files={args.files} file_size={size}B cpus={os.cpu_count()} workers={args.workers} cold={args.cold}")
+        print(f"serial:     {serial:.3f}s")
+        print(f"in-process: {in_process:.3f}s ({serial / in_process:.2f}x, {args.read_concurrency} read threads)")
+        if pooled is None:
+            print("pool:       skipped (fewer than 2 workers; validate_directory stays in-process)")
+        else:
+            print(f"pool:       {pooled:.3f}s ({serial / pooled:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
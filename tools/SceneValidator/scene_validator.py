@@ -1,21 +1,121 @@
 #!/usr/bin/env python3
 # SceneValidator - A tool to validate scene metadata and structure
 
+import argparse
+import asyncio
+import copy
+import dataclasses
+import functools
+import hashlib
+import io
 import json
+import logging
+import math
+import operator
 import os
+import pathlib
+import sqlite3
 import sys
-import logging
-import argparse
-from typing import Dict, List, Any, Optional
+import threading
+import time
+import unicodedata
+import zlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, TextIO, Tuple, Union
 
-# For Google Cloud and Gemini API integration
+# For Gemini API integration
 try:
     import google.generativeai as genai
-    from google.cloud import storage
     HAS_GOOGLE_APIS = True
 except ImportError:
     HAS_GOOGLE_APIS = False
-    print("Warning: Google Cloud or Gemini API libraries not found. Some features will be limited.")
+    print("Warning: Gemini API library not found. Some features will be limited.")
+
+# Prefer orjson for parsing and serialization; the standard library is the fallback
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# Optional code-generating JSON Schema validator for the structural checks
+try:
+    import fastjsonschema
+    HAS_FASTJSONSCHEMA = True
+except ImportError:
+    HAS_FASTJSONSCHEMA = False
+
+# Optional incremental parser for reading only the top level of large scene files
+try:
+    import ijson
+    HAS_IJSON = True
+except ImportError:
+    HAS_IJSON = False
+
+# Optional vectorized similarity search for the semantic cache
+try:
+    import numpy
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+# Optional faster compression for the response cache
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
+def _json_loads(data: Union[str, bytes]) -> Any:
+    """Parse JSON text or UTF-8 bytes."""
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _json_dumps(obj: Any, indent: bool = False, sort_keys: bool = False) -> str:
+    """Serialize to JSON text, either compact or indented by two spaces."""
+    if HAS_ORJSON:
+        option = (orjson.OPT_INDENT_2 if indent else 0) | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        return orjson.dumps(obj, option=option).decode("utf-8")
+    if indent:
+        return json.dumps(obj, indent=2, sort_keys=sort_keys, ensure_ascii=False, default=_json_default)
+    return json.dumps(obj, sort_keys=sort_keys, ensure_ascii=False, separators=(",", ":"), default=_json_default)
+
+def _json_default(obj: Any) -> Any:
+    # orjson serializes dataclasses natively; the standard library needs them converted
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+@functools.lru_cache(maxsize=16)
+def _read_config(config_path: str, mtime_ns: int) -> Dict[str, Any]:
+    """Parse a config file; cached per modification time so repeated loads are free."""
+    with open(config_path, 'rb') as f:
+        return _json_loads(f.read())
+
+# Structure checker owned by each worker process, built once by _worker_init
+_CHECKER: Optional["StructureChecker"] = None
+
+def _worker_init(validation_rules: Dict[str, Any], streaming_parse_min_bytes: int, keep_scene_data: bool) -> None:
+    """Build the worker's structure checker once instead of shipping it with every task."""
+    global _CHECKER
+    _CHECKER = StructureChecker(validation_rules, streaming_parse_min_bytes, keep_scene_data)
+
+def _validate_structure_worker(scene_file_path: str) -> Tuple["ValidationResult", Optional[Dict[str, Any]]]:
+    return _CHECKER.validate_file(scene_file_path)
+
+def _run_coroutine(coro: Any) -> Any:
+    """Run a coroutine to completion from synchronous code.
+    
+    asyncio.run cannot be called while an event loop is running, so callers that already have
+    one get the coroutine run on a fresh loop in a helper thread instead.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
 
 # Configure logging
 logging.basicConfig(
@@ -28,106 +128,629 @@ logging.basicConfig(
 )
 logger = logging.getLogger("SceneValidator")
 
+@dataclasses.dataclass(slots=True)
+class ValidationResult:
+    """Validation outcome for a single scene file."""
+    file: str
+    valid: bool = True
+    errors: List[str] = dataclasses.field(default_factory=list)
+    warnings: List[str] = dataclasses.field(default_factory=list)
+    suggestions: List[str] = dataclasses.field(default_factory=list)
+
+# Structural checks are CPU-bound, so the process pool never exceeds the core count
+CPU_COUNT = os.cpu_count() or 1
+
+# Errors raised when a scene file's content is not valid JSON
+SCENE_PARSE_ERRORS = (json.JSONDecodeError, ijson.JSONError) if HAS_IJSON else (json.JSONDecodeError,)
+
+# Errors raised when a response cache entry cannot be decompressed or parsed
+CACHE_DECODE_ERRORS = (ValueError, zlib.error, zstandard.ZstdError) if HAS_ZSTD else (ValueError, zlib.error)
+
+# Per-directory memo of results for files that have not changed since the last run
+MEMO_FILENAME = ".scene_validator_cache.json"
+
+GEMINI_MODEL = "gemini-pro"
+
+# Rule type name -> JSON Schema type. These must accept exactly what FIELD_TYPE_CHECKS accepts,
+# so "number" admits booleans just like isinstance(value, (int, float)) does
+SCHEMA_TYPES = {
+    "string": "string",
+    "number": ["number", "boolean"],
+    "array": "array",
+    "object": "object",
+}
+
+# Rule type name -> (Python type expression, noun used in error messages)
+FIELD_TYPE_CHECKS = {
+    "string": ("str", "a string"),
+    "number": ("(int, float)", "a number"),
+    "array": ("list", "an array"),
+    "object": ("dict", "an object"),
+}
+
+
+class SemanticCache:
+    """Reuses Gemini analyses for scenes that are near-identical to ones already analyzed.
+    
+    Scenes are embedded with the Gemini embedding model and compared by cosine similarity
+    against every cached embedding stored under the same namespace, so entries made with a
+    different model or different validation rules are never returned. Embeddings and
+    (namespace, response) pairs are persisted side by side in .scene_validator_embeddings.cache
+    and .scene_validator_responses.cache; the suffix keeps them out of directory scans for
+    .json scene files.
+    
+    Each lookup is a brute-force scan of max_entries vectors. With numpy the cached vectors are
+    kept in one contiguous matrix and a batch of lookups is a single matrix product; without it,
+    a scan of 1000 768-dimensional vectors costs tens of milliseconds per scene, so lower
+    max_entries if numpy is unavailable. Lookups may run on worker threads, guarded by a lock.
+    """
+    
+    EMBEDDING_MODEL = "models/embedding-001"
+    
+    def __init__(
+        self, directory: str = ".", namespace: str = "", similarity_threshold: float = 0.95, max_entries: int = 1000
+    ):
+        self.embeddings_path = os.path.join(directory, ".scene_validator_embeddings.cache")
+        self.responses_path = os.path.join(directory, ".scene_validator_responses.cache")
+        self.namespace = namespace
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self.embeddings: List[List[float]] = []
+        self.namespaces: List[str] = []
+        self.responses: List[Dict[str, Any]] = []
+        self._dirty = False
+        self._loaded = False
+        # (entry indices in this namespace, their vectors), rebuilt after the entries change
+        self._index: Optional[Tuple[List[int], Any]] = None
+        self._lock = threading.Lock()
+    
+    def _load(self) -> None:
+        # Loaded on first use so validators that never query the cache skip reading it
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self.embeddings_path, 'rb') as f:
+                embeddings = _json_loads(f.read())
+            with open(self.responses_path, 'rb') as f:
+                responses = _json_loads(f.read())
+        except FileNotFoundError:
+            return
+        except json.JSONDecodeError as e:
+            logger.warning(f"Ignoring unreadable semantic cache: {e}")
+            return
+        
+        if len(embeddings) != len(responses):
+            logger.warning("Ignoring semantic cache with mismatched embedding and response files")
+            return
+        if not all(isinstance(entry, list) and len(entry) == 2 for entry in responses):
+            logger.warning("Ignoring semantic cache written without namespaces")
+            return
+        self.embeddings = embeddings
+        self.namespaces = [namespace for namespace, _ in responses]
+        self.responses = [response for _, response in responses]
+        self._index = None
+    
+    def embed(self, scene_json: str) -> Optional[List[float]]:
+        """Embed a serialized scene, returning a unit-length vector or None on failure."""
+        return self.embed_many([scene_json])[0]
+    
+    def embed_many(self, scene_jsons: List[str]) -> List[Optional[List[float]]]:
+        """Embed several serialized scenes with one request.
+        
+        Returns a unit-length vector per scene, or None for every scene if the request failed.
+        """
+        try:
+            embeddings = genai.embed_content(model=self.EMBEDDING_MODEL, content=scene_jsons)["embedding"]
+            if len(embeddings) != len(scene_jsons):
+                raise ValueError("response did not match the number of scenes")
+        except Exception as e:
+            logger.warning(f"Failed to embed scenes for semantic cache: {e}")
+            return [None] * len(scene_jsons)
+        
+        vectors: List[Optional[List[float]]] = []
+        for embedding in embeddings:
+            norm = math.sqrt(sum(x * x for x in embedding))
+            vectors.append([x / norm for x in embedding] if norm else None)
+        return vectors
+    
+    def lookup(self, embedding: Optional[List[float]]) -> Optional[Dict[str, Any]]:
+        """Return a copy of the closest cached response in this namespace if it is similar enough."""
+        return self.lookup_many([embedding])[0]
+    
+    def lookup_many(self, embeddings: List[Optional[List[float]]]) -> List[Optional[Dict[str, Any]]]:
+        """Look up several embeddings at once, returning a response copy or None for each."""
+        with self._lock:
+            self._load()
+            indices, vectors = self._search_index()
+            queries = [i for i, embedding in enumerate(embeddings) if embedding is not None]
+            matches: List[Optional[Dict[str, Any]]] = [None] * len(embeddings)
+            if not indices or not queries:
+                return matches
+            
+            # Stored vectors are unit length, so the dot product is the cosine similarity
+            if HAS_NUMPY:
+                scores = vectors @ numpy.asarray([embeddings[q] for q in queries], dtype=numpy.float32).T
+                best = zip(scores.argmax(axis=0).tolist(), scores.max(axis=0).tolist())
+            else:
+                best = (
+                    max(
+                        ((row, sum(map(operator.mul, embeddings[q], vector))) for row, vector in enumerate(vectors)),
+                        key=operator.itemgetter(1)
+                    )
+                    for q in queries
+                )
+            
+            for q, (row, score) in zip(queries, best):
+                if score >= self.similarity_threshold:
+                    matches[q] = copy.deepcopy(self.responses[indices[row]])
+            return matches
+    
+    def _search_index(self) -> Tuple[List[int], Any]:
+        """The entries in this namespace and their vectors, as a matrix when numpy is available."""
+        if self._index is None:
+            indices = [i for i, namespace in enumerate(self.namespaces) if namespace == self.namespace]
+            vectors = [self.embeddings[i] for i in indices]
+            if HAS_NUMPY and indices:
+                vectors = numpy.asarray(vectors, dtype=numpy.float32)
+            self._index = (indices, vectors)
+        return self._index
+    
+    def add(self, embedding: Optional[List[float]], response: Dict[str, Any]) -> None:
+        if embedding is None:
+            return
+        with self._lock:
+            self._load()
+            self.embeddings.append(embedding)
+            self.namespaces.append(self.namespace)
+            self.responses.append(copy.deepcopy(response))
+            
+            # Drop the oldest entries once the cache is full
+            if len(self.embeddings) > self.max_entries:
+                del self.embeddings[:-self.max_entries]
+                del self.namespaces[:-self.max_entries]
+                del self.responses[:-self.max_entries]
+            self._index = None
+            self._dirty = True
+    
+    def save(self) -> None:
+        """Persist the cache if it changed since it was loaded."""
+        if not self._dirty:
+            return
+        try:
+            with open(self.embeddings_path, 'w', encoding='utf-8') as f:
+                f.write(_json_dumps(self.embeddings))
+            with open(self.responses_path, 'w', encoding='utf-8') as f:
+                f.write(_json_dumps(list(zip(self.namespaces, self.responses))))
+            self._dirty = False
+        except OSError as e:
+            logger.error(f"Failed to save semantic cache: {e}")
+
+
+class ResponseCache:
+    """Exact-match cache of Gemini analyses backed by SQLite.
+    
+    Keys are SHA-256 digests of the canonical scene JSON together with the model name and a
+    digest of the validation rules, so changing either invalidates old entries. Responses are
+    stored compressed, expire after ttl_seconds and are evicted least recently used first.
+    """
+    
+    def __init__(self, path: str, namespace: str, ttl_seconds: int = 7 * 24 * 3600, max_entries: int = 10000):
+        self.path = path
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._conn: Optional[sqlite3.Connection] = None
+    
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            # Lookups may run on the helper thread used by _run_coroutine; access is never concurrent
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache("
+                "key TEXT PRIMARY KEY, response BLOB, codec TEXT, created INTEGER, accessed INTEGER)"
+            )
+        return self._conn
+    
+    def key(self, scene_data: Dict[str, Any]) -> str:
+        canonical = unicodedata.normalize(
+            "NFC", _json_dumps(scene_data, sort_keys=True)
+        )
+        return hashlib.sha256(f"{self.namespace}\n{canonical}".encode("utf-8")).hexdigest()
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            row = self.conn.execute("SELECT response, codec, created FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            
+            response, codec, created = row
+            now = int(time.time())
+            if now - created > self.ttl_seconds:
+                with self.conn:
+                    self.conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                return None
+            
+            try:
+                cached = _json_loads(self._decompress(response, codec))
+            except CACHE_DECODE_ERRORS as e:
+                # A corrupt entry is a miss; drop it so the next analysis replaces it
+                logger.warning(f"Discarding unreadable response cache entry: {e}")
+                with self.conn:
+                    self.conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                return None
+            
+            with self.conn:
+                self.conn.execute("UPDATE cache SET accessed = ? WHERE key = ?", (now, key))
+            return cached
+        except sqlite3.Error as e:
+            logger.warning(f"Response cache lookup failed: {e}")
+            return None
+    
+    def put(self, key: str, response: Dict[str, Any]) -> None:
+        codec, blob = self._compress(_json_dumps(response).encode("utf-8"))
+        now = int(time.time())
+        try:
+            with self.conn:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO cache(key, response, codec, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                    (key, blob, codec, now, now)
+                )
+                self.conn.execute(
+                    "DELETE FROM cache WHERE key IN ("
+                    "SELECT key FROM cache ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to store response in cache: {e}")
+    
+    def _compress(self, data: bytes) -> Tuple[str, bytes]:
+        if HAS_ZSTD:
+            return "zstd", zstandard.ZstdCompressor().compress(data)
+        return "zlib", zlib.compress(data)
+    
+    def _decompress(self, blob: bytes, codec: str) -> bytes:
+        if codec == "zstd":
+            if not HAS_ZSTD:
+                raise ValueError("entry is zstd-compressed but zstandard is not installed")
+            return zstandard.ZstdDecompressor().decompress(blob)
+        return zlib.decompress(blob)
+
+
+class StructureChecker:
+    """Runs the local structural checks for one set of validation rules.
+    
+    This is everything a worker process needs, so workers build one of these rather than a
+    full SceneValidator with its Gemini client and caches.
+    """
+    
+    def __init__(
+        self, validation_rules: Dict[str, Any],
+        streaming_parse_min_bytes: int = 1024 * 1024, keep_scene_data: bool = False
+    ):
+        self.validation_rules = validation_rules
+        self.streaming_parse_min_bytes = streaming_parse_min_bytes
+        self.keep_scene_data = keep_scene_data
+        self._check = self._compile_rules(validation_rules)
+        self._schema_validate = self._compile_schema(validation_rules)
+    
+    @staticmethod
+    def _compile_rules(rules: Dict[str, Any]) -> Callable[[Dict[str, Any], List[str]], List[str]]:
+        """Specialize the validation rules into a straight-line checker function.
+        
+        The rules are walked once here rather than once per scene file. The returned
+        check(scene_data, errors) appends an error message for every failed rule and
+        returns the errors list.
+        """
+        lines = ["def check(d, errs):"]
+        
+        for field in rules.get("required_fields", []):
+            lines.append(f"    if {field!r} not in d:")
+            lines.append(f"        errs.append({'Missing required field: ' + str(field)!r})")
+        
+        for field, expected_type in rules.get("field_types", {}).items():
+            if expected_type not in FIELD_TYPE_CHECKS:
+                continue
+            python_type, noun = FIELD_TYPE_CHECKS[expected_type]
+            lines.append(f"    if {field!r} in d and not isinstance(d[{field!r}], {python_type}):")
+            lines.append(f"        errs.append({f'Field {field} should be {noun}'!r})")
+        
+        lines.append("    return errs")
+        namespace: Dict[str, Any] = {}
+        exec(compile("\n".join(lines), "<scene_validator rules>", "exec"), namespace)
+        return namespace["check"]
+    
+    @staticmethod
+    def _rules_to_schema(rules: Dict[str, Any]) -> Dict[str, Any]:
+        """Express the required fields and field types as a JSON Schema."""
+        return {
+            "$schema": "http://json-schema.org/draft-07/schema#",
+            "type": "object",
+            "required": list(rules.get("required_fields", [])),
+            "properties": {
+                field: {"type": SCHEMA_TYPES[expected_type]}
+                for field, expected_type in rules.get("field_types", {}).items()
+                if expected_type in SCHEMA_TYPES
+            }
+        }
+    
+    @classmethod
+    def _compile_schema(cls, rules: Dict[str, Any]) -> Optional[Callable[[Any], Any]]:
+        """Compile the rules' JSON Schema with fastjsonschema, if it is installed."""
+        if not HAS_FASTJSONSCHEMA:
+            return None
+        try:
+            return fastjsonschema.compile(cls._rules_to_schema(rules))
+        except fastjsonschema.JsonSchemaDefinitionException as e:
+            logger.error(f"Invalid validation rules schema: {e}")
+            return None
+    
+    def validate_file(self, scene_file_path: str) -> Tuple[ValidationResult, Optional[Dict[str, Any]]]:
+        """Load a scene file and run the structural checks.
+        
+        Returns the results and the parsed scene data. The scene data is only returned when keep_scene_data is set, so worker
+        processes do not send parsed trees back for nothing; it is also None if the file could
+        not be loaded or only its top level was parsed.
+        """
+        try:
+            with open(scene_file_path, 'rb') as f:
+                # Large scenes are streamed from the file rather than read into memory first
+                if self._parse_top_level_only(os.fstat(f.fileno()).st_size):
+                    scene_data, complete = self._parse_top_level(f)
+                else:
+                    scene_data, complete = _json_loads(f.read()), True
+        except (FileNotFoundError,) + SCENE_PARSE_ERRORS as e:
+            logger.error(f"Error processing scene file {scene_file_path}: {e}")
+            return ValidationResult(
+                file=scene_file_path,
+                valid=False,
+                errors=[f"Failed to process file: {str(e)}"]
+            ), None
+        
+        # Basic structural validation
+        errors = self.errors(scene_data)
+        results = ValidationResult(file=scene_file_path, valid=not errors, errors=errors)
+        
+        return results, scene_data if complete and self.keep_scene_data else None
+    
+    def _parse_top_level_only(self, size: int) -> bool:
+        """Whether a scene of the given size should be streamed for its top-level fields only.
+        
+        The structural checks only look at top-level fields, so the full tree is only needed
+        when the scene data is kept for Gemini analysis.
+        """
+        return HAS_IJSON and not self.keep_scene_data and size >= self.streaming_parse_min_bytes
+    
+    def _parse_top_level(self, stream: BinaryIO) -> Tuple[Any, bool]:
+        """Incrementally parse a scene, keeping only its top-level fields.
+        
+        Nested objects and arrays are replaced by empty placeholders of the same type, which is
+        all the structural checks need. Returns the scene and whether it was parsed in full,
+        which only happens when the document is not a JSON object.
+        """
+        events = ijson.parse(stream, use_float=True)
+        first = next(events, None)
+        if first is None or first[1] != "start_map":
+            stream.seek(0)
+            return _json_loads(stream.read()), True
+        
+        scene_data: Dict[str, Any] = {}
+        depth = 1
+        key = None
+        for _, event, value in events:
+            if event == "start_map" or event == "start_array":
+                if depth == 1:
+                    scene_data[key] = {} if event == "start_map" else []
+                depth += 1
+            elif event == "end_map" or event == "end_array":
+                depth -= 1
+            elif depth == 1:
+                if event == "map_key":
+                    key = value
+                else:
+                    scene_data[key] = value
+        return scene_data, False
+    
+    def errors(self, scene_data: Any) -> List[str]:
+        """Return the structural errors for a parsed scene."""
+        if self._schema_validate is None:
+            # The rule checker looks fields up by name, which only works on objects
+            if not isinstance(scene_data, dict):
+                return ["Scene must be a JSON object"]
+            return self._check(scene_data, [])
+        
+        try:
+            self._schema_validate(scene_data)
+            return []
+        except fastjsonschema.JsonSchemaException as e:
+            if not isinstance(scene_data, dict):
+                return [e.message]
+            # The schema validator stops at the first failure; the rule checker reports every
+            # failed rule, and the schema message covers anything only the schema rejects
+            return self._check(scene_data, []) or [e.message]
+
+
 class SceneValidator:
     """Validates scene metadata and structure for media projects."""
     
     def __init__(self, config_path: str = "config.json"):
         """Initialize the validator with configuration."""
+        self.config_path = config_path
         self.config = self._load_config(config_path)
         self.validation_rules = self.config.get("validation_rules", {})
+        self.max_workers = min(self.config.get("max_workers") or CPU_COUNT, CPU_COUNT)
+        self.parallel_min_files = self.config.get("parallel_min_files", 2000)
+        self.read_concurrency = max(1, self.config.get("read_concurrency", 1))
+        self.gemini_batch_size = max(1, self.config.get("gemini_batch_size", 10))
+        self.gemini_concurrency = max(1, self.config.get("gemini_concurrency", 20))
+        self.min_fields_for_advanced = self.config.get("min_fields_for_advanced", 10)
+        self.volatile_fields = frozenset(self.config.get("volatile_fields", ["id", "created_at", "uuid"]))
+        self.memoize_results = self.config.get("memoize_results", True)
+        self.rules_digest = hashlib.sha256(
+            _json_dumps(self.validation_rules, sort_keys=True).encode("utf-8")
+        ).hexdigest()
         self.gemini_configured = False
+        self.response_cache: Optional[ResponseCache] = None
+        self.semantic_cache: Optional[SemanticCache] = None
+        self._model = None
         
         # Initialize Gemini API if available
         if HAS_GOOGLE_APIS and "gemini_api_key" in self.config:
             try:
                 genai.configure(api_key=self.config["gemini_api_key"])
+                # One model instance for the validator's lifetime so its client and connections are reused
+                self._model = genai.GenerativeModel(GEMINI_MODEL)
                 self.gemini_configured = True
                 logger.info("Gemini API configured successfully")
             except Exception as e:
                 logger.error(f"Failed to configure Gemini API: {e}")
+        
+        # Parsed scene data is only needed when Gemini will analyze it
+        self.structure = StructureChecker(
+            self.validation_rules,
+            streaming_parse_min_bytes=self.config.get("streaming_parse_min_bytes", 1024 * 1024),
+            keep_scene_data=self.gemini_configured
+        )
+        
+        # Cached analyses are only reusable with the same model and validation rules
+        cache_namespace = f"{GEMINI_MODEL}:{self.rules_digest}"
+        response_cache_config = self.config.get("response_cache", {})
+        if self.gemini_configured and response_cache_config.get("enabled", False):
+            self.response_cache = ResponseCache(
+                path=response_cache_config.get("path", "responses_cache.sqlite"),
+                namespace=cache_namespace,
+                ttl_seconds=response_cache_config.get("ttl_seconds", 7 * 24 * 3600),
+                max_entries=response_cache_config.get("max_entries", 10000)
+            )
+        
+        cache_config = self.config.get("semantic_cache", {})
+        if self.gemini_configured and cache_config.get("enabled", False):
+            self.semantic_cache = SemanticCache(
+                directory=cache_config.get("directory", "."),
+                namespace=cache_namespace,
+                similarity_threshold=cache_config.get("similarity_threshold", 0.95),
+                max_entries=cache_config.get("max_entries", 1000)
+            )
     
     def _load_config(self, config_path: str) -> Dict[str, Any]:
         """Load configuration from a JSON file."""
         try:
-            with open(config_path, 'r') as f:
-                return json.load(f)
+            # Copy so callers cannot mutate the cached config
+            return copy.deepcopy(_read_config(config_path, os.stat(config_path).st_mtime_ns))
         except (FileNotFoundError, json.JSONDecodeError) as e:
             logger.error(f"Error loading configuration: {e}")
             return {}
     
-    def validate_scene_file(self, scene_file_path: str) -> Dict[str, Any]:
+    def validate_scene_file(self, scene_file_path: str) -> ValidationResult:
         """Validate a scene file against the defined rules."""
-        try:
-            with open(scene_file_path, 'r') as f:
-                scene_data = json.load(f)
-            
-            # Basic structural validation
-            results = {
-                "file": scene_file_path,
-                "valid": True,
-                "errors": [],
-                "warnings": [],
-                "suggestions": []
-            }
-            
-            # Check required fields
-            for field in self.validation_rules.get("required_fields", []):
-                if field not in scene_data:
-                    results["valid"] = False
-                    results["errors"].append(f"Missing required field: {field}")
-            
-            # Check field types
-            for field, expected_type in self.validation_rules.get("field_types", {}).items():
-                if field in scene_data:
-                    # Simple type checking
-                    if expected_type == "string" and not isinstance(scene_data[field], str):
-                        results["valid"] = False
-                        results["errors"].append(f"Field {field} should be a string")
-                    elif expected_type == "number" and not isinstance(scene_data[field], (int, float)):
-                        results["valid"] = False
-                        results["errors"].append(f"Field {field} should be a number")
-                    elif expected_type == "array" and not isinstance(scene_data[field], list):
-                        results["valid"] = False
-                        results["errors"].append(f"Field {field} should be an array")
-                    elif expected_type == "object" and not isinstance(scene_data[field], dict):
-                        results["valid"] = False
-                        results["errors"].append(f"Field {field} should be an object")
-            
-            # Use Gemini API for advanced validation if available
-            if self.gemini_configured and results["valid"]:
-                advanced_results = self._advanced_validation_with_gemini(scene_data)
-                results["suggestions"].extend(advanced_results.get("suggestions", []))
-                results["warnings"].extend(advanced_results.get("warnings", []))
-                
-                # If advanced validation found critical issues
-                if advanced_results.get("critical_issues", False):
-                    results["valid"] = False
-                    results["errors"].extend(advanced_results.get("errors", []))
-            
-            return results
-            
-        except (FileNotFoundError, json.JSONDecodeError) as e:
-            logger.error(f"Error processing scene file {scene_file_path}: {e}")
-            return {
-                "file": scene_file_path,
-                "valid": False,
-                "errors": [f"Failed to process file: {str(e)}"],
-                "warnings": [],
-                "suggestions": []
-            }
+        results, scene_data = self.structure.validate_file(scene_file_path)
+        
+        # Use Gemini API for advanced validation if available and worthwhile
+        if self.gemini_configured and results.valid and self._is_complex_enough(scene_data):
+            self._merge_advanced_results(results, self._advanced_validation_with_gemini(scene_data))
+        
+        return results
     
-    def _advanced_validation_with_gemini(self, scene_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Use Gemini API for more advanced validation and suggestions."""
-        results = {
+    def _is_complex_enough(self, scene_data: Any) -> bool:
+        """Whether a scene has enough fields, counted at every nesting level, to merit Gemini analysis."""
+        remaining = self.min_fields_for_advanced
+        stack = [scene_data]
+        while stack and remaining > 0:
+            node = stack.pop()
+            if isinstance(node, dict):
+                remaining -= len(node)
+                stack.extend(node.values())
+            elif isinstance(node, list):
+                stack.extend(node)
+        return remaining <= 0
+    
+    def _merge_advanced_results(self, results: ValidationResult, advanced_results: Dict[str, Any]) -> None:
+        """Fold advanced validation output into a file's results."""
+        results.suggestions.extend(advanced_results.get("suggestions", []))
+        results.warnings.extend(advanced_results.get("warnings", []))
+        
+        # If advanced validation found critical issues
+        if advanced_results.get("critical_issues", False):
+            results.valid = False
+            results.errors.extend(advanced_results.get("errors", []))
+    
+    def _empty_advanced_results(self) -> Dict[str, Any]:
+        return {
             "suggestions": [],
             "warnings": [],
             "errors": [],
             "critical_issues": False
         }
+    
+    def _analysis_to_results(self, gemini_analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert one Gemini analysis object into advanced validation results."""
+        results = self._empty_advanced_results()
+        
+        # Add Gemini's insights to our results
+        if gemini_analysis.get("critical_issues"):
+            results["critical_issues"] = True
+            results["errors"].extend(gemini_analysis["critical_issues"])
+        
+        if gemini_analysis.get("warnings"):
+            results["warnings"].extend(gemini_analysis["warnings"])
+        
+        if gemini_analysis.get("suggestions"):
+            results["suggestions"].extend(gemini_analysis["suggestions"])
+        
+        return results
+    
+    def _lookup_cached_analysis(
+        self, scene_data: Dict[str, Any], scene_json: str
+    ) -> Tuple[Optional[Dict[str, Any]], Tuple[Optional[str], Optional[List[float]]]]:
+        """Look a scene up in the exact-match cache, then the semantic cache.
+        
+        Returns the cached results (or None) and the (hash key, embedding) pair to store a fresh
+        analysis under.
+        """
+        cached, key = self._lookup_exact(scene_data)
+        if cached is not None:
+            return cached, (key, None)
+        
+        embedding = None
+        if self.semantic_cache:
+            embedding = self.semantic_cache.embed(scene_json)
+            cached = self._promote_semantic_hit(key, self.semantic_cache.lookup(embedding))
+        return cached, (key, embedding)
+    
+    def _lookup_exact(self, scene_data: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """Look a scene up in the exact-match cache, returning the cached results and its key."""
+        if not self.response_cache:
+            return None, None
+        key = self.response_cache.key(scene_data)
+        return self.response_cache.get(key), key
+    
+    def _promote_semantic_hit(self, key: Optional[str], cached: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Copy a semantic cache hit into the exact-match cache and return it."""
+        # Promote near matches so the next identical request skips the embedding call
+        if cached is not None and key is not None:
+            self.response_cache.put(key, cached)
+        return cached
+    
+    def _store_analysis(self, cache_keys: Tuple[Optional[str], Optional[List[float]]], results: Dict[str, Any]) -> None:
+        key, embedding = cache_keys
+        if self.response_cache and key is not None:
+            self.response_cache.put(key, results)
+        if self.semantic_cache:
+            self.semantic_cache.add(embedding, results)
+    
+    def _advanced_validation_with_gemini(self, scene_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Use Gemini API for more advanced validation and suggestions."""
+        results = self._empty_advanced_results()
         
         try:
             # Prepare scene data for Gemini
-            scene_json = json.dumps(scene_data, indent=2)
+            scene_json = _json_dumps(scene_data, indent=True)
+            
+            # Reuse the analysis of an identical or near-identical scene if one is cached
+            cached, cache_keys = self._lookup_cached_analysis(scene_data, scene_json)
+            if cached is not None:
+                return cached
             
             # Create a prompt for Gemini
             prompt = f"""Analyze the following media scene data for potential issues, inconsistencies, or improvements:
@@ -143,73 +766,382 @@ Provide your analysis in JSON format with the following structure:
 """
             
             # Query Gemini API
-            model = genai.GenerativeModel('gemini-pro')
-            response = model.generate_content(prompt)
+            response = self._model.generate_content(prompt)
             
             # Process the response
             try:
-                gemini_analysis = json.loads(response.text)
-                
-                # Add Gemini's insights to our results
-                if gemini_analysis.get("critical_issues"):
-                    results["critical_issues"] = True
-                    results["errors"].extend(gemini_analysis["critical_issues"])
-                
-                if gemini_analysis.get("warnings"):
-                    results["warnings"].extend(gemini_analysis["warnings"])
-                
-                if gemini_analysis.get("suggestions"):
-                    results["suggestions"].extend(gemini_analysis["suggestions"])
-                    
+                results = self._analysis_to_results(_json_loads(response.text))
+                self._store_analysis(cache_keys, results)
+                if self.semantic_cache:
+                    self.semantic_cache.save()
             except json.JSONDecodeError:
                 # If Gemini didn't return valid JSON
                 results["warnings"].append("Advanced validation produced non-JSON response")
+                results["failed"] = True
                 logger.warning("Gemini response was not valid JSON")
         
         except Exception as e:
             logger.error(f"Error during advanced validation: {e}")
             results["warnings"].append(f"Advanced validation failed: {str(e)}")
+            results["failed"] = True
         
         return results
     
-    def validate_directory(self, directory_path: str) -> List[Dict[str, Any]]:
-        """Validate all scene files in a directory."""
+    async def _advanced_validation_chunks(self, chunks: List[List[Dict[str, Any]]]) -> List[List[Dict[str, Any]]]:
+        """Run the batch analysis of every chunk concurrently.
+        
+        At most gemini_concurrency requests are in flight at once to stay within API quotas.
+        """
+        semaphore = asyncio.Semaphore(self.gemini_concurrency)
+        outcomes = await asyncio.gather(
+            *(self._advanced_validation_batch_async(chunk, semaphore) for chunk in chunks),
+            return_exceptions=True
+        )
+        
+        if self.semantic_cache:
+            self.semantic_cache.save()
+        
+        return [
+            self._failed_batch(len(chunk), f"Advanced validation failed: {str(outcome)}")
+            if isinstance(outcome, BaseException) else outcome
+            for chunk, outcome in zip(chunks, outcomes)
+        ]
+    
+    async def _advanced_validation_batch_async(
+        self, scenes: List[Dict[str, Any]], semaphore: asyncio.Semaphore
+    ) -> List[Dict[str, Any]]:
+        """Analyze several scenes with a single Gemini request.
+        
+        Scenes with a cache hit are answered locally and left out of the request.
+        Returns one advanced validation results dict per scene, in input order.
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(scenes)
+        keys: List[Optional[str]] = [None] * len(scenes)
+        embeddings: List[Optional[List[float]]] = [None] * len(scenes)
+        for i, scene_data in enumerate(scenes):
+            results[i], keys[i] = self._lookup_exact(scene_data)
+        
+        # Embed the exact-cache misses with one request, off the event loop and within the
+        # request quota, so batches embed concurrently rather than one scene at a time
+        unmatched = [i for i, cached in enumerate(results) if cached is None]
+        if self.semantic_cache and unmatched:
+            scene_jsons = [_json_dumps(scenes[i], indent=True) for i in unmatched]
+            async with semaphore:
+                vectors = await asyncio.to_thread(self.semantic_cache.embed_many, scene_jsons)
+            # Scanning the cached vectors is CPU work, so it stays off the event loop as well
+            matches = await asyncio.to_thread(self.semantic_cache.lookup_many, vectors)
+            for i, embedding, cached in zip(unmatched, vectors, matches):
+                embeddings[i] = embedding
+                results[i] = self._promote_semantic_hit(keys[i], cached)
+        cache_keys = list(zip(keys, embeddings))
+        
+        misses = [i for i, cached in enumerate(results) if cached is None]
+        if not misses:
+            return results
+        
+        try:
+            async with semaphore:
+                analyses = await self._request_batch_analysis_async([scenes[i] for i in misses])
+        except json.JSONDecodeError:
+            logger.warning("Gemini batch response was not valid JSON")
+            analyzed = self._failed_batch(len(misses), "Advanced validation produced non-JSON response")
+        except Exception as e:
+            logger.error(f"Error during batch advanced validation: {e}")
+            analyzed = self._failed_batch(len(misses), f"Advanced validation failed: {str(e)}")
+        else:
+            analyzed = []
+            for i, analysis in zip(misses, analyses):
+                # A malformed element is a failed analysis: reported, but never cached
+                if not isinstance(analysis, dict):
+                    logger.warning("Gemini batch response contained a malformed analysis")
+                    analyzed.extend(self._failed_batch(1, "Advanced validation returned a malformed analysis"))
+                    continue
+                advanced_results = self._analysis_to_results(analysis)
+                self._store_analysis(cache_keys[i], advanced_results)
+                analyzed.append(advanced_results)
+        
+        for i, advanced_results in zip(misses, analyzed):
+            results[i] = advanced_results
+        return results
+    
+    async def _request_batch_analysis_async(self, scenes: List[Dict[str, Any]]) -> List[Any]:
+        """Send one Gemini request covering all scenes and return the per-scene analyses.
+        
+        Elements are returned as Gemini produced them; callers must check each is an object.
+        """
+        scenes_json = "\n\n".join(
+            f"Scene {i}:\n{_json_dumps(scene_data, indent=True)}" for i, scene_data in enumerate(scenes)
+        )
+        
+        prompt = f"""Analyze each of the following {len(scenes)} media scenes for potential issues, inconsistencies, or improvements:
+
+{scenes_json}
+
+Respond with a JSON array where element i corresponds to scene i and has the following structure:
+{{
+  "critical_issues": [list of critical problems that make the scene invalid],
+  "warnings": [list of potential problems or inconsistencies],
+  "suggestions": [list of improvements or optimizations]
+}}
+"""
+        
+        response = await self._model.generate_content_async(
+            prompt,
+            generation_config={"response_mime_type": "application/json"}
+        )
+        
+        analyses = _json_loads(response.text)
+        if not isinstance(analyses, list) or len(analyses) != len(scenes):
+            raise ValueError("response did not match the number of scenes")
+        return analyses
+    
+    def _failed_batch(self, count: int, warning: str) -> List[Dict[str, Any]]:
+        """Build per-scene results for a batch that could not be analyzed."""
         results = []
+        for _ in range(count):
+            failed = self._empty_advanced_results()
+            failed["warnings"].append(warning)
+            failed["failed"] = True
+            results.append(failed)
+        return results
+    
+    def validate_directory(self, directory_path: str) -> List[ValidationResult]:
+        """Validate all scene files in a directory.
         
+        Files whose modification time and size match the directory memo reuse their previous
+        results without being opened.
+        """
+        # Never treat the validator's own config or cache files as scenes
+        excluded = self._own_file_paths()
         try:
-            for file in os.listdir(directory_path):
-                if file.endswith(".json"):
-                    file_path = os.path.join(directory_path, file)
-                    results.append(self.validate_scene_file(file_path))
+            with os.scandir(directory_path) as entries:
+                scene_files = sorted(
+                    (entry.name, entry.path, entry.stat())
+                    for entry in entries
+                    if entry.name.endswith(".json") and entry.name != MEMO_FILENAME
+                    and os.path.abspath(entry.path) not in excluded and entry.is_file()
+                )
         except FileNotFoundError:
             logger.error(f"Directory not found: {directory_path}")
+            return []
         
-        return results
+        if not scene_files:
+            return []
+        
+        memo = self._load_memo(directory_path)
+        stamps = {name: [st.st_mtime_ns, st.st_size] for name, _, st in scene_files}
+        results_by_name: Dict[str, ValidationResult] = {}
+        stale = []
+        for name, path, _ in scene_files:
+            entry = memo.get(name)
+            if entry is not None and entry.get("stamp") == stamps[name]:
+                results_by_name[name] = ValidationResult(**entry["result"])
+            else:
+                stale.append((name, path))
+        
+        # Results whose advanced validation failed are not memoized so the next run retries them
+        unsettled = set()
+        if stale:
+            structural = self._validate_structures([path for _, path in stale])
+            
+            for (name, _), (file_results, _) in zip(stale, structural):
+                results_by_name[name] = file_results
+            
+            # Send structurally valid scenes to Gemini in concurrent batches rather than one request per file
+            if self.gemini_configured:
+                # Scenes that differ only in volatile fields share a single analysis
+                groups: Dict[str, List[Tuple[str, ValidationResult]]] = {}
+                unique_scenes: List[Tuple[str, Dict[str, Any]]] = []
+                for (name, _), (file_results, scene_data) in zip(stale, structural):
+                    if not (file_results.valid and self._is_complex_enough(scene_data)):
+                        continue
+                    fingerprint = self._scene_fingerprint(scene_data)
+                    if fingerprint not in groups:
+                        groups[fingerprint] = []
+                        unique_scenes.append((fingerprint, scene_data))
+                    groups[fingerprint].append((name, file_results))
+                
+                chunks = [
+                    unique_scenes[start:start + self.gemini_batch_size]
+                    for start in range(0, len(unique_scenes), self.gemini_batch_size)
+                ]
+                advanced_chunks = _run_coroutine(self._advanced_validation_chunks(
+                    [[scene_data for _, scene_data in chunk] for chunk in chunks]
+                ))
+                for chunk, advanced in zip(chunks, advanced_chunks):
+                    for (fingerprint, _), advanced_results in zip(chunk, advanced):
+                        for name, file_results in groups[fingerprint]:
+                            self._merge_advanced_results(file_results, advanced_results)
+                            if advanced_results.get("failed"):
+                                unsettled.add(name)
+        
+        if self.memoize_results:
+            self._save_memo(directory_path, {
+                name: {"stamp": stamps[name], "result": dataclasses.asdict(results_by_name[name])}
+                for name, _, _ in scene_files
+                if name not in unsettled
+            })
+        
+        return [results_by_name[name] for name, _, _ in scene_files]
     
-    def generate_report(self, validation_results: List[Dict[str, Any]], output_file: Optional[str] = None) -> str:
-        """Generate a detailed validation report."""
-        report = {
-            "summary": {
-                "total_files": len(validation_results),
-                "valid_files": sum(1 for r in validation_results if r["valid"]),
-                "invalid_files": sum(1 for r in validation_results if not r["valid"]),
-                "total_errors": sum(len(r["errors"]) for r in validation_results),
-                "total_warnings": sum(len(r["warnings"]) for r in validation_results),
-                "total_suggestions": sum(len(r["suggestions"]) for r in validation_results)
-            },
-            "details": validation_results
-        }
+    def _validate_structures(self, paths: List[str]) -> List[Tuple[ValidationResult, Optional[Dict[str, Any]]]]:
+        """Run the structural checks for many files, in worker processes when it pays off.
+        
+        Starting a pool costs more than validating small directories, so fewer than
+        parallel_min_files files, or a single usable core, are checked in-process. In-process
+        files are read on up to read_concurrency threads so their I/O waits overlap. Parsing
+        still holds the GIL, so this only pays off where reads block, such as network mounts;
+        on a local disk the threads cost more than they save and the default is one.
+        """
+        workers = min(self.max_workers, len(paths))
+        if workers < 2 or len(paths) < self.parallel_min_files:
+            readers = min(self.read_concurrency, len(paths))
+            if readers < 2:
+                return [self.structure.validate_file(path) for path in paths]
+            with ThreadPoolExecutor(max_workers=readers) as executor:
+                return list(executor.map(self.structure.validate_file, paths))
         
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_worker_init,
+            initargs=(self.validation_rules, self.structure.streaming_parse_min_bytes, self.structure.keep_scene_data)
+        ) as executor:
+            # Large chunks keep the per-task IPC overhead small relative to the parsing work
+            chunksize = max(1, len(paths) // (workers * 4))
+            return list(executor.map(_validate_structure_worker, paths, chunksize=chunksize))
+    
+    def _own_file_paths(self) -> frozenset:
+        """Absolute paths of the validator's config and every cache file it writes."""
+        paths = [self.config_path]
+        if self.response_cache:
+            paths.append(self.response_cache.path)
+        if self.semantic_cache:
+            paths.extend([self.semantic_cache.embeddings_path, self.semantic_cache.responses_path])
+        return frozenset(os.path.abspath(path) for path in paths)
+    
+    def _scene_fingerprint(self, scene_data: Dict[str, Any]) -> str:
+        """Hash a scene's canonical JSON, ignoring the configured volatile top-level fields."""
+        stable = {k: v for k, v in scene_data.items() if k not in self.volatile_fields}
+        return hashlib.sha256(_json_dumps(stable, sort_keys=True).encode("utf-8")).hexdigest()
+    
+    def _memo_fingerprint(self) -> str:
+        """Identify the settings a memoized result depends on."""
+        if not self.gemini_configured:
+            return f"local:{self.rules_digest}"
+        return f"{GEMINI_MODEL}:{self.min_fields_for_advanced}:{self.rules_digest}"
+    
+    def _load_memo(self, directory_path: str) -> Dict[str, Any]:
+        """Load the directory memo, discarding it if it was built with different settings."""
+        if not self.memoize_results:
+            return {}
+        try:
+            with open(os.path.join(directory_path, MEMO_FILENAME), 'rb') as f:
+                memo = _json_loads(f.read())
+        except FileNotFoundError:
+            return {}
+        except json.JSONDecodeError as e:
+            logger.warning(f"Ignoring unreadable result memo in {directory_path}: {e}")
+            return {}
+        
+        if not isinstance(memo, dict) or memo.get("fingerprint") != self._memo_fingerprint():
+            return {}
+        return memo.get("files", {})
+    
+    def _save_memo(self, directory_path: str, files: Dict[str, Any]) -> None:
+        try:
+            with open(os.path.join(directory_path, MEMO_FILENAME), 'w', encoding='utf-8') as f:
+                f.write(_json_dumps({"fingerprint": self._memo_fingerprint(), "files": files}))
+        except OSError as e:
+            logger.warning(f"Failed to save result memo in {directory_path}: {e}")
+    
+    def generate_report(self, validation_results: List[ValidationResult], output_file: Optional[str] = None) -> str:
+        """Generate a detailed validation report."""
         # Save report to file if specified
         if output_file:
-            try:
-                with open(output_file, 'w') as f:
-                    json.dump(report, f, indent=2)
-                logger.info(f"Report saved to {output_file}")
-            except Exception as e:
-                logger.error(f"Failed to save report: {e}")
+            self.save_report(validation_results, output_file)
+        
+        buffer = io.StringIO()
+        self.write_report(validation_results, buffer)
+        return buffer.getvalue()
+    
+    def save_report(self, validation_results: List[ValidationResult], output_file: str) -> bool:
+        """Stream the validation report to a file, returning whether it was written.
         
-        return json.dumps(report, indent=2)
+        The report is written to a temporary file that then replaces the target, so an
+        interrupted run leaves any previous report intact.
+        """
+        tmp_path = None
+        try:
+            report_path = self._resolve_report_path(output_file)
+            tmp_path = report_path.with_name(report_path.name + ".tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                self.write_report(validation_results, f)
+            os.replace(tmp_path, report_path)
+            logger.info(f"Report saved to {output_file}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to save report: {e}")
+            if tmp_path is not None and tmp_path.exists():
+                tmp_path.unlink()
+            return False
+    
+    def _resolve_report_path(self, output_file: str) -> pathlib.Path:
+        """Resolve the report path, rejecting anything outside the working directory."""
+        report_path = pathlib.Path(output_file).resolve()
+        cwd = pathlib.Path.cwd().resolve()
+        if cwd not in report_path.parents:
+            raise ValueError(f"Report path {output_file} is outside the working directory")
+        return report_path
+    
+    def write_report(self, validation_results: List[ValidationResult], stream: TextIO) -> None:
+        """Write the validation report as JSON to a text stream.
+        
+        Results are serialized one at a time, so the full report is never held in memory.
+        """
+        stream.write('{\n  "summary": ')
+        stream.write(self._report_json(self._report_summary(validation_results)).replace("\n", "\n  "))
+        
+        if not validation_results:
+            stream.write(',\n  "details": []\n}')
+            return
+        
+        stream.write(',\n  "details": [')
+        separator = "\n    "
+        for file_results in validation_results:
+            stream.write(separator)
+            stream.write(self._report_json(file_results).replace("\n", "\n    "))
+            separator = ",\n    "
+        stream.write("\n  ]\n}")
+    
+    def _report_json(self, obj: Any) -> str:
+        """Serialize part of the report as indented JSON with non-ASCII characters escaped.
+        
+        The report has always been pure ASCII, which keeps it writable to streams in any
+        encoding. orjson cannot escape, so the rare non-ASCII result goes through json.dumps.
+        """
+        text = _json_dumps(obj, indent=True)
+        if text.isascii():
+            return text
+        return json.dumps(obj, indent=2, default=_json_default)
+    
+    def _report_summary(self, validation_results: List[ValidationResult]) -> Dict[str, int]:
+        """Count files, errors, warnings and suggestions in a single pass."""
+        summary = {
+            "total_files": len(validation_results),
+            "valid_files": 0,
+            "invalid_files": 0,
+            "total_errors": 0,
+            "total_warnings": 0,
+            "total_suggestions": 0
+        }
+        for r in validation_results:
+            if r.valid:
+                summary["valid_files"] += 1
+            else:
+                summary["invalid_files"] += 1
+            summary["total_errors"] += len(r.errors)
+            summary["total_warnings"] += len(r.warnings)
+            summary["total_suggestions"] += len(r.suggestions)
+        return summary
 
 def main():
     """Main entry point for command line usage."""
@@ -230,8 +1162,13 @@ def main():
         parser.print_help()
         sys.exit(1)
     
-    report = validator.generate_report(results, args.output)
-    print(report)
+    saved = validator.save_report(results, args.output) if args.output else True
+    validator.write_report(results, sys.stdout)
+    sys.stdout.write("\n")
+    
+    # A requested report that could not be written must fail the run, not go missing silently
+    if not saved:
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
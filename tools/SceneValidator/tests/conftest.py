@@ -0,0 +1,76 @@
+import importlib
+import json
+import os
+import re
+import sys
+import types
+
+import pytest
+
+TOOL_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, TOOL_DIR)
+
+
+@pytest.fixture
+def sv(tmp_path, monkeypatch):
+    """The scene_validator module, used from a scratch working directory.
+
+    The module logs to scene_validator.log in the working directory when first imported.
+    """
+    monkeypatch.chdir(tmp_path)
+    return importlib.import_module("scene_validator")
+
+
+@pytest.fixture
+def write_config(tmp_path):
+    """Write a config.json based on the shipped one, with overrides, and return its path.
+
+    The Gemini API key is left out unless given, so validation stays local.
+    """
+    def write(**overrides):
+        with open(os.path.join(TOOL_DIR, "config.json"), 'r') as f:
+            config = json.load(f)
+        del config["gemini_api_key"]
+        config.update(overrides)
+        path = tmp_path / "config.json"
+        path.write_text(json.dumps(config))
+        return str(path)
+    return write
+
+
+@pytest.fixture
+def fake_gemini(sv, monkeypatch):
+    """Stand in for google.generativeai, answering each batch with one analysis per scene.
+
+    Each analysis suggests "checked <scene_id>"; a scene named "bad" gets a malformed analysis.
+    Embeddings are only ever requested in batches, as the semantic cache does in directory mode.
+    The prompts of every request are recorded in the returned list.
+    """
+    prompts = []
+
+    class Response:
+        def __init__(self, text):
+            self.text = text
+
+    class GenerativeModel:
+        def __init__(self, name):
+            self.name = name
+
+        async def generate_content_async(self, prompt, generation_config=None):
+            prompts.append(prompt)
+            analyses = [
+                "oops" if scene_id == "bad" else {"suggestions": [f"checked {scene_id}"]}
+                for scene_id in re.findall(r'"scene_id": "(\w+)"', prompt)
+            ]
+            return Response(json.dumps(analyses))
+
+    def embed_content(model, content):
+        # Character counts are enough to make identical scenes identical vectors
+        return {"embedding": [[float(text.count(c)) for c in "aeiou_\":{}"] for text in content]}
+
+    genai = types.SimpleNamespace(
+        configure=lambda api_key: None, GenerativeModel=GenerativeModel, embed_content=embed_content
+    )
+    monkeypatch.setattr(sv, "HAS_GOOGLE_APIS", True)
+    monkeypatch.setattr(sv, "genai", genai, raising=False)
+    return prompts
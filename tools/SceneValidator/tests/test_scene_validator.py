@@ -0,0 +1,608 @@
+import asyncio
+import dataclasses
+import json
+import os
+
+import pytest
+
+
+SCENE = {
+    "scene_id": "sc_01",
+    "name": "Intro",
+    "duration": 45.5,
+    "elements": [{"id": "char_a", "type": "character"}],
+}
+
+
+def write_scene(directory, name, scene):
+    path = directory / name
+    path.write_text(json.dumps(scene))
+    return path
+
+
+@pytest.fixture
+def clock(sv, monkeypatch):
+    """Freeze time.time at a settable value."""
+    now = [1_000_000.0]
+    monkeypatch.setattr(sv.time, "time", lambda: now[0])
+    return now
+
+
+def test_response_cache_expires_entries(sv, clock, tmp_path):
+    cache = sv.ResponseCache(str(tmp_path / "cache.sqlite"), "ns", ttl_seconds=60)
+    key = cache.key(SCENE)
+    cache.put(key, {"warnings": ["w"]})
+
+    clock[0] += 60
+    assert cache.get(key) == {"warnings": ["w"]}
+
+    clock[0] += 1
+    assert cache.get(key) is None
+    assert cache.conn.execute("SELECT COUNT(*) FROM cache").fetchone() == (0,)
+
+
+def test_response_cache_evicts_least_recently_used(sv, clock, tmp_path):
+    cache = sv.ResponseCache(str(tmp_path / "cache.sqlite"), "ns", max_entries=2)
+    cache.put("a", {"n": 1})
+    clock[0] += 1
+    cache.put("b", {"n": 2})
+    clock[0] += 1
+    cache.get("a")
+    clock[0] += 1
+    cache.put("c", {"n": 3})
+
+    assert cache.get("a") == {"n": 1}
+    assert cache.get("b") is None
+    assert cache.get("c") == {"n": 3}
+
+
+def test_response_cache_key_depends_on_namespace_not_key_order(sv, tmp_path):
+    cache = sv.ResponseCache(str(tmp_path / "cache.sqlite"), "ns")
+    other = sv.ResponseCache(str(tmp_path / "cache.sqlite"), "other")
+    reordered = dict(reversed(list(SCENE.items())))
+
+    assert cache.key(SCENE) == cache.key(reordered)
+    assert cache.key(SCENE) != other.key(SCENE)
+
+
+def test_directory_batches_answer_cached_scenes_locally(sv, write_config, fake_gemini, tmp_path):
+    scenes = tmp_path / "scenes"
+    scenes.mkdir()
+    write_scene(scenes, "a.json", SCENE)
+    config_path = write_config(
+        gemini_api_key="key", min_fields_for_advanced=1, memoize_results=False,
+        response_cache={"enabled": True, "path": str(tmp_path / "responses.sqlite")},
+        semantic_cache={"enabled": False}
+    )
+    sv.SceneValidator(config_path).validate_directory(str(scenes))
+    write_scene(scenes, "b.json", dict(SCENE, scene_id="sc_02"))
+
+    results = sv.SceneValidator(config_path).validate_directory(str(scenes))
+
+    assert len(fake_gemini) == 2
+    assert fake_gemini[1].count('"scene_id": ') == 1
+    assert [r.suggestions for r in results] == [["checked sc_01"], ["checked sc_02"]]
+
+
+def test_process_pool_matches_in_process(sv, write_config, tmp_path):
+    scenes = tmp_path / "scenes"
+    scenes.mkdir()
+    write_scene(scenes, "a.json", SCENE)
+    write_scene(scenes, "b.json", {"scene_id": 7, "name": "No duration", "elements": []})
+    (scenes / "c.json").write_text("{not json")
+    validator = sv.SceneValidator(write_config(memoize_results=False))
+
+    in_process = validator.validate_directory(str(scenes))
+    validator.parallel_min_files = 1
+    validator.max_workers = 2
+    pooled = validator.validate_directory(str(scenes))
+
+    assert pooled == in_process
+    assert [r.valid for r in pooled] == [True, False, False]
+
+
+def test_small_directories_skip_the_process_pool(sv, write_config, tmp_path, monkeypatch):
+    scenes = tmp_path / "scenes"
+    scenes.mkdir()
+    write_scene(scenes, "a.json", SCENE)
+    write_scene(scenes, "b.json", SCENE)
+    validator = sv.SceneValidator(write_config(memoize_results=False))
+    validator.max_workers = 2
+    validator.parallel_min_files = 3
+
+    def no_pool(*args, **kwargs):
+        raise AssertionError("process pool started")
+
+    monkeypatch.setattr(sv, "ProcessPoolExecutor", no_pool)
+    assert [r.valid for r in validator.validate_directory(str(scenes))] == [True, True]
+
+
+def test_directory_batches_scatter_results_back_in_order(sv, write_config, fake_gemini, tmp_path):
+    scenes = tmp_path / "scenes"
+    scenes.mkdir()
+    for i in range(5):
+        write_scene(scenes, f"s{i}.json", dict(SCENE, scene_id=f"sc_{i}"))
+    validator = sv.SceneValidator(write_config(
+        gemini_api_key="key", gemini_batch_size=2, min_fields_for_advanced=1,
+        response_cache={"enabled": False}, semantic_cache={"enabled": False}
+    ))
+
+    results = validator.validate_directory(str(scenes))
+
+    assert len(fake_gemini) == 3
+    assert [r.suggestions for r in results] == [[f"checked sc_{i}"] for i in range(5)]
+
+
+def test_malformed_batch_analysis_is_not_cached_or_memoized(sv, write_config, fake_gemini, tmp_path):
+    scenes = tmp_path / "scenes"
+    scenes.mkdir()
+    write_scene(scenes, "a.json", SCENE)
+    write_scene(scenes, "b.json", dict(SCENE, scene_id="bad"))
+    config_path = write_config(
+        gemini_api_key="key", min_fields_for_advanced=1,
+        response_cache={"enabled": True, "path": str(tmp_path / "responses.sqlite")},
+        semantic_cache={"enabled": False}
+    )
+    validator = sv.SceneValidator(config_path)
+
+    results = validator.validate_directory(str(scenes))
+
+    assert results[0].suggestions == ["checked sc_01"]
+    assert results[1].warnings == ["Advanced validation returned a malformed analysis"]
+    assert validator.response_cache.get(validator.response_cache.key(dict(SCENE, scene_id="bad"))) is None
+    memo = json.loads((scenes / sv.MEMO_FILENAME).read_text())
+    assert list(memo["files"]) == ["a.json"]
+
+
+def test_semantic_cache_hits_near_matches_only(sv, tmp_path):
+    cache = sv.SemanticCache(str(tmp_path), similarity_threshold=0.95)
+    cache.add([1.0, 0.0], {"warnings": ["w"]})
+
+    hit = cache.lookup([0.99, 0.141])
+    assert hit == {"warnings": ["w"]}
+    hit["warnings"].append("changed")
+    assert cache.lookup([1.0, 0.0]) == {"warnings": ["w"]}
+    assert cache.lookup([0.0, 1.0]) is None
+    assert cache.lookup(None) is None
+
+
+def test_semantic_cache_persists_and_keeps_newest_entries(sv, tmp_path):
+    cache = sv.SemanticCache(str(tmp_path), max_entries=2)
+    cache.add([1.0, 0.0, 0.0], {"n": 1})
+    cache.add([0.0, 1.0, 0.0], {"n": 2})
+    cache.add([0.0, 0.0, 1.0], {"n": 3})
+    cache.save()
+
+    reloaded = sv.SemanticCache(str(tmp_path))
+    assert reloaded.lookup([1.0, 0.0, 0.0]) is None
+    assert reloaded.lookup([0.0, 1.0, 0.0]) == {"n": 2}
+    assert reloaded.lookup([0.0, 0.0, 1.0]) == {"n": 3}
+
+
+def test_semantic_cache_ignores_mismatched_files(sv, tmp_path):
+    cache = sv.SemanticCache(str(tmp_path))
+    with open(cache.embeddings_path, 'w') as f:
+        json.dump([[1.0, 0.0], [0.0, 1.0]], f)
+    with open(cache.responses_path, 'w') as f:
+        json.dump([{"n": 1}], f)
+
+    assert cache.lookup([1.0, 0.0]) is None
+
+
+def test_directory_skips_config_and_cache_files(sv, write_config, tmp_path):
+    write_scene(tmp_path, "a.json", SCENE)
+    validator = sv.SceneValidator(write_config(memoize_results=False))
+
+    results = validator.validate_directory(str(tmp_path))
+
+    assert [os.path.basename(r.file) for r in results] == ["a.json"]
+
+
+@pytest.fixture
+def count_structure_checks(monkeypatch):
+    """Count the files a validator runs the structural checks on."""
+    def count(validator):
+        checked = []
+        validate_file = validator.structure.validate_file
+
+        def counting(path):
+            checked.append(os.path.basename(path))
+            return validate_file(path)
+
+        monkeypatch.setattr(validator.structure, "validate_file", counting)
+        return checked
+    return count
+
+
+def test_memo_reuses_unchanged_files(sv, write_config, tmp_path, count_structure_checks):
+    scenes = tmp_path / "scenes"
+    scenes.mkdir()
+    write_scene(scenes, "a.json", SCENE)
+    changed = write_scene(scenes, "b.json", SCENE)
+    config_path = write_config()
+
+    first = sv.SceneValidator(config_path).validate_directory(str(scenes))
+    assert [r.valid for r in first] == [True, True]
+
+    st = changed.stat()
+    os.utime(changed, ns=(st.st_atime_ns, st.st_mtime_ns + 1))
+    validator = sv.SceneValidator(config_path)
+    checked = count_structure_checks(validator)
+    second = validator.validate_directory(str(scenes))
+
+    assert checked == ["b.json"]
+    assert second == first
+
+
+def test_memo_is_discarded_when_rules_change(sv, write_config, tmp_path, count_structure_checks):
+    scenes = tmp_path / "scenes"
+    scenes.mkdir()
+    write_scene(scenes, "a.json", SCENE)
+    write_scene(scenes, "b.json", SCENE)
+    sv.SceneValidator(write_config()).validate_directory(str(scenes))
+
+    validator = sv.SceneValidator(write_config(validation_rules={"required_fields": ["director"]}))
+    checked = count_structure_checks(validator)
+    results = validator.validate_directory(str(scenes))
+
+    assert sorted(checked) == ["a.json", "b.json"]
+    assert [r.errors for r in results] == [["Missing required field: director"]] * 2
+
+
+def test_unreadable_memo_is_ignored(sv, write_config, tmp_path):
+    scenes = tmp_path / "scenes"
+    scenes.mkdir()
+    write_scene(scenes, "a.json", SCENE)
+    (scenes / sv.MEMO_FILENAME).write_text("{truncated")
+
+    results = sv.SceneValidator(write_config()).validate_directory(str(scenes))
+
+    assert [r.valid for r in results] == [True]
+    assert list(json.loads((scenes / sv.MEMO_FILENAME).read_text())["files"]) == ["a.json"]
+
+
+RULES = {
+    "required_fields": ["scene_id", "name", "duration", "it's \"quoted\""],
+    "field_types": {
+        "scene_id": "string",
+        "duration": "number",
+        "elements": "array",
+        "metadata": "object",
+        "notes": "markdown",
+    },
+}
+
+
+def baseline_errors(rules, scene_data):
+    """The structural errors exactly as the original hand-written loops reported them."""
+    errors = [f"Missing required field: {field}" for field in rules["required_fields"] if field not in scene_data]
+    nouns = {"string": (str, "a string"), "number": ((int, float), "a number"),
+             "array": (list, "an array"), "object": (dict, "an object")}
+    for field, expected_type in rules["field_types"].items():
+        if field in scene_data and expected_type in nouns and not isinstance(scene_data[field], nouns[expected_type][0]):
+            errors.append(f"Field {field} should be {nouns[expected_type][1]}")
+    return errors
+
+
+@pytest.mark.parametrize("scene", [
+    {},
+    SCENE,
+    {"scene_id": 1, "duration": "long", "elements": {}, "metadata": [], "notes": 5},
+    {"it's \"quoted\"": None, "name": "n", "duration": True, "metadata": {}},
+])
+def test_compiled_checker_matches_original_messages_and_order(sv, scene):
+    check = sv.StructureChecker._compile_rules(RULES)
+
+    assert check(scene, []) == baseline_errors(RULES, scene)
+
+
+def test_schema_and_rule_checker_agree_on_booleans(sv):
+    pytest.importorskip("fastjsonschema")
+    rules = {"required_fields": ["duration"], "field_types": {"duration": "number", "name": "string"}}
+    checker = sv.StructureChecker(rules)
+
+    for scene in ({"duration": True}, {"duration": "long"}, {"duration": 1, "name": False}, {}):
+        assert checker.errors(scene) == checker._check(scene, [])
+
+
+async def answer():
+    await asyncio.sleep(0)
+    return 42
+
+
+def test_run_coroutine_without_a_running_loop(sv):
+    assert sv._run_coroutine(answer()) == 42
+
+
+def test_run_coroutine_inside_a_running_loop(sv):
+    async def caller():
+        return sv._run_coroutine(answer())
+
+    assert asyncio.run(caller()) == 42
+
+
+def test_directory_batches_run_from_async_callers(sv, write_config, fake_gemini, tmp_path):
+    scenes = tmp_path / "scenes"
+    scenes.mkdir()
+    write_scene(scenes, "a.json", SCENE)
+    validator = sv.SceneValidator(write_config(
+        gemini_api_key="key", min_fields_for_advanced=1,
+        response_cache={"enabled": False}, semantic_cache={"enabled": False}
+    ))
+
+    async def caller():
+        return validator.validate_directory(str(scenes))
+
+    assert [r.suggestions for r in asyncio.run(caller())] == [["checked sc_01"]]
+
+
+def test_complexity_counts_fields_at_every_level(sv, write_config):
+    validator = sv.SceneValidator(write_config(min_fields_for_advanced=7))
+
+    assert not validator._is_complex_enough(SCENE)
+    assert validator._is_complex_enough(dict(SCENE, metadata={"director": "d"}))
+    assert not validator._is_complex_enough([])
+
+
+def test_only_valid_non_trivial_scenes_reach_gemini(sv, write_config, fake_gemini, tmp_path):
+    scenes = tmp_path / "scenes"
+    scenes.mkdir()
+    write_scene(scenes, "complex.json", dict(SCENE, metadata={"director": "d"}))
+    write_scene(scenes, "invalid.json", dict(SCENE, scene_id="sc_02", duration="long", metadata={"director": "d"}))
+    write_scene(scenes, "trivial.json", dict(SCENE, scene_id="sc_03"))
+    validator = sv.SceneValidator(write_config(
+        gemini_api_key="key", min_fields_for_advanced=7,
+        response_cache={"enabled": False}, semantic_cache={"enabled": False}
+    ))
+
+    results = validator.validate_directory(str(scenes))
+
+    assert len(fake_gemini) == 1
+    assert fake_gemini[0].count('"scene_id": ') == 1
+    assert [r.suggestions for r in results] == [["checked sc_01"], [], []]
+
+
+def baseline_report(validation_results):
+    """The report exactly as the original generate_report built it."""
+    details = [dataclasses.asdict(r) for r in validation_results]
+    report = {
+        "summary": {
+            "total_files": len(details),
+            "valid_files": sum(1 for r in details if r["valid"]),
+            "invalid_files": sum(1 for r in details if not r["valid"]),
+            "total_errors": sum(len(r["errors"]) for r in details),
+            "total_warnings": sum(len(r["warnings"]) for r in details),
+            "total_suggestions": sum(len(r["suggestions"]) for r in details)
+        },
+        "details": details
+    }
+    return json.dumps(report, indent=2)
+
+
+@pytest.mark.parametrize("count", [0, 1, 3, 4])
+def test_report_matches_baseline(sv, write_config, count):
+    results = [
+        sv.ValidationResult(file="a.json"),
+        sv.ValidationResult(
+            file="b.json", valid=False,
+            errors=["Missing required field: duration", 'Field "name" should be a string'],
+            warnings=["Scene is long"]
+        ),
+        sv.ValidationResult(file="c.json", suggestions=["Add a description", "Tab\there, bell \u0007"]),
+        sv.ValidationResult(file="Größe.json", warnings=["Größe 🎬 \u2028"]),
+    ][:count]
+    validator = sv.SceneValidator(write_config())
+
+    report = validator.generate_report(results, output_file="report.json")
+
+    assert report == baseline_report(results)
+    assert report.isascii()
+    with open("report.json", 'r', encoding='utf-8') as f:
+        assert f.read() == report
+
+
+@pytest.mark.parametrize("output_file", ["../report.json", "reports/../../report.json"])
+def test_save_report_rejects_paths_outside_the_working_directory(sv, write_config, tmp_path, monkeypatch, output_file):
+    (tmp_path / "cwd" / "reports").mkdir(parents=True)
+    validator = sv.SceneValidator(write_config())
+    monkeypatch.chdir(tmp_path / "cwd")
+
+    assert not validator.save_report([sv.ValidationResult(file="a.json")], output_file)
+    assert not (tmp_path / "report.json").exists()
+
+
+def test_failed_save_keeps_previous_report_and_leaves_no_temporary_file(sv, write_config, tmp_path, monkeypatch):
+    validator = sv.SceneValidator(write_config())
+    (tmp_path / "report.json").write_text("previous")
+
+    def failing_write(validation_results, stream):
+        stream.write("{partial")
+        raise OSError("disk full")
+
+    monkeypatch.setattr(validator, "write_report", failing_write)
+
+    assert not validator.save_report([sv.ValidationResult(file="a.json")], "report.json")
+    assert (tmp_path / "report.json").read_text() == "previous"
+    assert sorted(p.name for p in tmp_path.iterdir() if p.name.startswith("report")) == ["report.json"]
+
+
+NESTED_SCENE = dict(
+    SCENE, description=None, looping=False, take=3,
+    metadata={"director": "d", "tags": [{"a": [1, 2]}]}, settings=[],
+)
+
+
+def test_top_level_parse_agrees_with_full_parse(sv, tmp_path):
+    pytest.importorskip("ijson")
+    path = write_scene(tmp_path, "a.json", NESTED_SCENE)
+    checker = sv.StructureChecker({}, streaming_parse_min_bytes=0)
+
+    with open(path, 'rb') as f:
+        scene_data, complete = checker._parse_top_level(f)
+
+    assert not complete
+    assert list(scene_data) == list(NESTED_SCENE)
+    for key, value in NESTED_SCENE.items():
+        assert scene_data[key] == (type(value)() if isinstance(value, (dict, list)) else value)
+
+
+def test_top_level_parse_reads_non_objects_in_full(sv, tmp_path):
+    pytest.importorskip("ijson")
+    path = tmp_path / "a.json"
+    path.write_text("[1, {\"b\": 2}]")
+    checker = sv.StructureChecker({}, streaming_parse_min_bytes=0)
+
+    with open(path, 'rb') as f:
+        assert checker._parse_top_level(f) == ([1, {"b": 2}], True)
+
+
+@pytest.mark.parametrize("scene", [NESTED_SCENE, {"scene_id": 1, "duration": "long", "elements": {}}])
+def test_streamed_validation_matches_full_validation(sv, tmp_path, scene):
+    pytest.importorskip("ijson")
+    path = write_scene(tmp_path, "a.json", scene)
+    rules = {"required_fields": ["scene_id", "name"], "field_types": dict(RULES["field_types"], settings="object")}
+
+    streamed, _ = sv.StructureChecker(rules, streaming_parse_min_bytes=0).validate_file(str(path))
+    full, _ = sv.StructureChecker(rules, streaming_parse_min_bytes=1 << 30).validate_file(str(path))
+
+    assert streamed == full
+
+
+def test_directory_batches_analyze_duplicate_scenes_once(sv, write_config, fake_gemini, tmp_path):
+    scenes = tmp_path / "scenes"
+    scenes.mkdir()
+    write_scene(scenes, "a.json", dict(SCENE, id="1", created_at="2024-01-01"))
+    write_scene(scenes, "b.json", dict(SCENE, scene_id="sc_02"))
+    write_scene(scenes, "c.json", dict(SCENE, id="2", created_at="2024-02-01"))
+    validator = sv.SceneValidator(write_config(
+        gemini_api_key="key", min_fields_for_advanced=1,
+        response_cache={"enabled": False}, semantic_cache={"enabled": False}
+    ))
+
+    results = validator.validate_directory(str(scenes))
+
+    assert len(fake_gemini) == 1
+    assert fake_gemini[0].count('"scene_id": ') == 2
+    assert [r.suggestions for r in results] == [["checked sc_01"], ["checked sc_02"], ["checked sc_01"]]
+
+
+def test_scene_fingerprint_ignores_only_volatile_fields(sv, write_config):
+    validator = sv.SceneValidator(write_config(volatile_fields=["id", "uuid"]))
+
+    assert validator._scene_fingerprint(dict(SCENE, id="1")) == validator._scene_fingerprint(dict(SCENE, uuid="u"))
+    assert validator._scene_fingerprint(SCENE) != validator._scene_fingerprint(dict(SCENE, created_at="now"))
+
+
+@pytest.mark.parametrize("document", ["null", "42", "\"x\"", "[]"])
+def test_non_object_scenes_are_invalid(sv, write_config, tmp_path, document):
+    scenes = tmp_path / "scenes"
+    scenes.mkdir()
+    (scenes / "a.json").write_text(document)
+    write_scene(scenes, "b.json", SCENE)
+
+    results = sv.SceneValidator(write_config(memoize_results=False)).validate_directory(str(scenes))
+
+    assert [r.valid for r in results] == [False, True]
+    assert len(results[0].errors) == 1
+    if not sv.HAS_FASTJSONSCHEMA:
+        assert results[0].errors == ["Scene must be a JSON object"]
+
+
+def test_semantic_cache_only_matches_its_own_namespace(sv, tmp_path):
+    cache = sv.SemanticCache(str(tmp_path), namespace="old")
+    cache.add([1.0, 0.0], {"n": 1})
+    cache.save()
+
+    assert sv.SemanticCache(str(tmp_path), namespace="new").lookup([1.0, 0.0]) is None
+    assert sv.SemanticCache(str(tmp_path), namespace="old").lookup([1.0, 0.0]) == {"n": 1}
+
+
+def test_semantic_cache_ignores_files_without_namespaces(sv, tmp_path):
+    cache = sv.SemanticCache(str(tmp_path))
+    with open(cache.embeddings_path, 'w') as f:
+        json.dump([[1.0, 0.0]], f)
+    with open(cache.responses_path, 'w') as f:
+        json.dump([{"n": 1}], f)
+
+    assert cache.lookup([1.0, 0.0]) is None
+
+
+def test_rule_changes_invalidate_cached_analyses(sv, write_config, fake_gemini, tmp_path):
+    scenes = tmp_path / "scenes"
+    scenes.mkdir()
+    write_scene(scenes, "a.json", SCENE)
+    caches = dict(
+        gemini_api_key="key", min_fields_for_advanced=1, memoize_results=False,
+        response_cache={"enabled": True, "path": str(tmp_path / "responses.sqlite")},
+        semantic_cache={"enabled": True, "directory": str(tmp_path)}
+    )
+    sv.SceneValidator(write_config(**caches)).validate_directory(str(scenes))
+    sv.SceneValidator(write_config(**caches)).validate_directory(str(scenes))
+    assert len(fake_gemini) == 1
+
+    rules = {"required_fields": ["scene_id"], "field_types": {"scene_id": "string"}}
+    sv.SceneValidator(write_config(validation_rules=rules, **caches)).validate_directory(str(scenes))
+    assert len(fake_gemini) == 2
+
+
+@pytest.mark.parametrize("codec", ["zlib", "zstd"])
+def test_response_cache_discards_corrupt_entries(sv, tmp_path, codec):
+    cache = sv.ResponseCache(str(tmp_path / "cache.sqlite"), "ns")
+    cache.put("a", {"n": 1})
+    with cache.conn:
+        cache.conn.execute("UPDATE cache SET response = ?, codec = ? WHERE key = 'a'", (b"\x28\xb5\x2f\xfdjunk", codec))
+
+    assert cache.get("a") is None
+    assert cache.conn.execute("SELECT COUNT(*) FROM cache").fetchone() == (0,)
+
+
+@pytest.mark.parametrize("use_numpy", [False, True])
+def test_semantic_cache_batched_lookups_match_single_lookups(sv, tmp_path, monkeypatch, use_numpy):
+    if use_numpy:
+        pytest.importorskip("numpy")
+    monkeypatch.setattr(sv, "HAS_NUMPY", use_numpy)
+    cache = sv.SemanticCache(str(tmp_path), namespace="ns", similarity_threshold=0.9)
+    cache.add([1.0, 0.0, 0.0], {"n": 1})
+    cache.add([0.0, 1.0, 0.0], {"n": 2})
+    queries = [[0.0, 0.99, 0.141], None, [0.0, 0.0, 1.0], [0.995, 0.0, 0.0998]]
+
+    assert cache.lookup_many(queries) == [{"n": 2}, None, None, {"n": 1}]
+    assert [cache.lookup(q) for q in queries] == cache.lookup_many(queries)
+
+    cache.add([0.0, 0.0, 1.0], {"n": 3})
+    assert cache.lookup([0.0, 0.0, 1.0]) == {"n": 3}
+
+
+def test_threaded_reads_match_serial_reads(sv, write_config, tmp_path):
+    scenes = tmp_path / "scenes"
+    scenes.mkdir()
+    for i in range(6):
+        write_scene(scenes, f"s{i}.json", dict(SCENE, scene_id=i if i % 2 else f"sc_{i}"))
+    (scenes / "s6.json").write_text("{not json")
+    validator = sv.SceneValidator(write_config(memoize_results=False))
+
+    serial = validator.validate_directory(str(scenes))
+    validator.read_concurrency = 4
+    threaded = validator.validate_directory(str(scenes))
+
+    assert threaded == serial
+    assert [r.valid for r in threaded] == [True, False, True, False, True, False, False]
+
+
+@pytest.mark.parametrize("output_file, exit_code", [("report.json", None), ("../report.json", 1)])
+def test_main_fails_when_the_report_cannot_be_saved(sv, write_config, tmp_path, monkeypatch, capsys, output_file, exit_code):
+    (tmp_path / "cwd").mkdir()
+    scene = write_scene(tmp_path, "a.json", SCENE)
+    monkeypatch.setattr(sv.sys, "argv", [
+        "scene_validator.py", "--config", write_config(), "--file", str(scene), "--output", output_file
+    ])
+    monkeypatch.chdir(tmp_path / "cwd")
+
+    if exit_code is None:
+        sv.main()
+        assert (tmp_path / "cwd" / "report.json").exists()
+    else:
+        with pytest.raises(SystemExit) as exc_info:
+            sv.main()
+        assert exc_info.value.code == exit_code
+    assert json.loads(capsys.readouterr().out)["summary"]["valid_files"] == 1